@@ -2,6 +2,6 @@
 Notechart: Generate SingStar-style notecharts from audio for rhythm games.
 """
 
-from .core import NoteChartGenerator
+from .core import NoteChartAnalyzer, NoteChartGenerator
 
-__all__ = ["NoteChartGenerator"]
+__all__ = ["NoteChartAnalyzer", "NoteChartGenerator"]
@@ -0,0 +1,232 @@
+"""
+Numba kernels behind the NoteChartAnalyzer pipeline stages.
+"""
+
+import numpy as np
+
+try:
+    from numba import njit
+    HAVE_NUMBA = True
+except ImportError:
+    # numba is optional: core.py falls back to list-based loops for the per-frame
+    # stages, and the remaining kernels run as plain Python
+    HAVE_NUMBA = False
+
+    def njit(*args, **kwargs):
+        if len(args) == 1 and callable(args[0]):
+            return args[0]
+        return lambda fn: fn
+
+
+# Per-frame steps shared by the stage kernels and the fused kernels, so each
+# state machine is written once; numba inlines them into the callers' loops.
+@njit(cache=True)
+def _clamp_step(p, prev):
+    if p != 0 and prev != 0:
+        if p > prev * 1.9:
+            return p * 0.5
+        if p < prev * 0.55:
+            return p * 2.0
+    return p
+
+
+@njit(cache=True)
+def _window_step(p, dropped, total, count):
+    # Slide the voiced-only running sum: add the new frame, drop the old one
+    if p > 0:
+        total += p
+        count += 1
+    if dropped > 0:
+        total -= dropped
+        count -= 1
+    if count == 0:
+        total = 0.0
+    return total, count
+
+
+@njit(cache=True)
+def _hysteresis_step(p, current, candidate, count, stability_frames):
+    # Returns (output, current, candidate, count)
+    if np.isnan(p):
+        return np.nan, current, np.nan, 0
+    if p == candidate:
+        count += 1
+    else:
+        candidate = p
+        count = 1
+    if count >= stability_frames:
+        current = candidate
+    return current, current, candidate, count
+
+
+@njit(cache=True)
+def _hold_step(p, held, hold_tolerance):
+    # Returns the held pitch, which is also the output
+    if np.isnan(p):
+        return np.nan
+    if np.isnan(held) or abs(p - held) > hold_tolerance:
+        return p
+    return held
+
+
+@njit(cache=True)
+def _fill_step(p, t, last_pitch, last_time, max_gap):
+    # Returns (output, last_pitch, last_time)
+    if np.isnan(p) and not np.isnan(last_pitch) and t - last_time < max_gap:
+        return last_pitch, last_pitch, last_time
+    return p, p, t
+
+
+@njit(cache=True, fastmath=True)
+def clamp_octaves(pitches):
+    out = np.empty_like(pitches)
+    prev = 0.0
+    for i in range(pitches.shape[0]):
+        prev = _clamp_step(pitches[i], prev)
+        out[i] = prev
+    return out
+
+
+@njit(cache=True)
+def smooth_time_series(pitches, window_size):
+    out = np.empty_like(pitches)
+    total = 0.0
+    count = 0
+    for i in range(pitches.shape[0]):
+        j = i - window_size - 1
+        dropped = pitches[j] if j >= 0 else 0.0
+        total, count = _window_step(pitches[i], dropped, total, count)
+        out[i] = total / count if count else 0.0
+    return out
+
+
+@njit(cache=True)
+def apply_hysteresis(pitches, stability_frames):
+    out = np.empty_like(pitches)
+    current = np.nan
+    candidate = np.nan
+    count = 0
+    for i in range(pitches.shape[0]):
+        out[i], current, candidate, count = _hysteresis_step(
+            pitches[i], current, candidate, count, stability_frames
+        )
+    return out
+
+
+@njit(cache=True)
+def hold_pitch(pitches, hold_tolerance):
+    out = np.empty_like(pitches)
+    held = np.nan
+    for i in range(pitches.shape[0]):
+        held = _hold_step(pitches[i], held, hold_tolerance)
+        out[i] = held
+    return out
+
+
+@njit(cache=True)
+def fill_micro_gaps(times, pitches, max_gap):
+    out = np.empty_like(pitches)
+    last_pitch = np.nan
+    last_time = 0.0
+    for i in range(pitches.shape[0]):
+        out[i], last_pitch, last_time = _fill_step(
+            pitches[i], times[i], last_pitch, last_time, max_gap
+        )
+    return out
+
+
+@njit(cache=True)
+def stabilize(times, pitches, stability_frames, hold_tolerance, max_gap):
+    # apply_hysteresis -> hold_pitch -> fill_micro_gaps in a single sweep
+    out = np.empty_like(pitches)
+    current = np.nan
+    candidate = np.nan
+    count = 0
+    held = np.nan
+    last_pitch = np.nan
+    last_time = 0.0
+    for i in range(pitches.shape[0]):
+        p, current, candidate, count = _hysteresis_step(
+            pitches[i], current, candidate, count, stability_frames
+        )
+        held = _hold_step(p, held, hold_tolerance)
+        out[i], last_pitch, last_time = _fill_step(
+            held, times[i], last_pitch, last_time, max_gap
+        )
+    return out
+
+
+@njit(cache=True)
+def pitch_pipeline(times, pitches, smooth_frames, stability_frames, hold_tolerance, max_gap):
+    # clamp_octaves -> smooth_time_series -> MIDI quantization -> stabilize,
+    # one frame at a time without intermediate arrays
+    out = np.empty_like(pitches)
+    prev = 0.0
+    window = np.zeros(smooth_frames + 1)
+    total = 0.0
+    count = 0
+    current = np.nan
+    candidate = np.nan
+    run = 0
+    held = np.nan
+    last_pitch = np.nan
+    last_time = 0.0
+    for i in range(pitches.shape[0]):
+        prev = _clamp_step(pitches[i], prev)
+
+        # Smoothing over a circular buffer of the trailing window
+        slot = i % (smooth_frames + 1)
+        dropped = window[slot]
+        window[slot] = prev
+        total, count = _window_step(prev, dropped, total, count)
+
+        # MIDI quantization to half-semitones
+        if count == 0:
+            p = np.nan
+        else:
+            p = np.rint((69 + 12 * np.log2(total / count / 440.0)) * 2.0) * 0.5
+
+        p, current, candidate, run = _hysteresis_step(
+            p, current, candidate, run, stability_frames
+        )
+        held = _hold_step(p, held, hold_tolerance)
+        out[i], last_pitch, last_time = _fill_step(
+            held, times[i], last_pitch, last_time, max_gap
+        )
+    return out
+
+
+@njit(cache=True)
+def merge_notes(starts, ends, pitches, gap, pitch_tol, min_duration):
+    out_starts = np.empty_like(starts)
+    out_ends = np.empty_like(ends)
+    out_pitches = np.empty_like(pitches)
+    j = 0
+    for i in range(starts.shape[0]):
+        if ends[i] - starts[i] < min_duration:
+            continue
+        if (
+            j > 0
+            and abs(pitches[i] - out_pitches[j - 1]) <= pitch_tol
+            and starts[i] - out_ends[j - 1] <= gap
+        ):
+            out_ends[j - 1] = ends[i]
+            out_pitches[j - 1] = (out_pitches[j - 1] + pitches[i]) / 2
+        else:
+            out_starts[j] = starts[i]
+            out_ends[j] = ends[i]
+            out_pitches[j] = pitches[i]
+            j += 1
+    return out_starts[:j], out_ends[:j], out_pitches[:j]
+
+
+if HAVE_NUMBA:
+    # Compile up front so the first chart doesn't pay the JIT cost
+    clamp_octaves(np.zeros(2))
+    smooth_time_series(np.zeros(2), 1)
+    apply_hysteresis(np.zeros(2), 1)
+    hold_pitch(np.zeros(2), 0.0)
+    fill_micro_gaps(np.zeros(2), np.zeros(2), 0.0)
+    stabilize(np.zeros(2), np.zeros(2), 1, 0.0, 0.0)
+    pitch_pipeline(np.zeros(2), np.zeros(2), 1, 1, 0.0, 0.0)
+    merge_notes(np.zeros(2), np.ones(2), np.zeros(2), 0.0, 0.0, 0.0)
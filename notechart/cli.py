@@ -1,22 +1,53 @@
 import argparse
+import sys
 from notechart.core import NoteChartGenerator
 
 
+def positive_int(value: str) -> int:
+        n = int(value)
+        if n < 1:
+            raise argparse.ArgumentTypeError(f"must be at least 1, got {n}")
+        return n
+
+
+def non_negative_int(value: str) -> int:
+        n = int(value)
+        if n < 0:
+            raise argparse.ArgumentTypeError(f"must be at least 0, got {n}")
+        return n
+
+
 def build_arg_parser():
         p = argparse.ArgumentParser("notechart")
 
         # ------------------
         # Analysis
         # ------------------
-        p.add_argument("--window-size", type=int, default=2048)
-        p.add_argument("--hop-size", type=int, default=512)
+        p.add_argument(
+            "--window-size", type=positive_int, default=2048,
+            help="FFT window size; rounded to the nearest power of two so YIN "
+                 "uses fast radix-2 FFTs",
+        )
+        p.add_argument(
+            "--hop-size", type=positive_int, default=512,
+            help="Hop size between frames; rounded to the nearest power of two",
+        )
         p.add_argument("--min-freq", type=float, default=50.0)
         p.add_argument("--max-freq", type=float, default=2000.0)
+        p.add_argument(
+            "--min-confidence", type=float, default=0.0,
+            help="Treat frames below this aubio pitch confidence (0-1) as unvoiced",
+        )
+        p.add_argument(
+            "--analysis-sr", type=positive_int, default=None,
+            help="Resample to this rate before pitch detection (default: the "
+                 "file's native rate); lower rates are proportionally faster",
+        )
 
         # ------------------
         # Stability
         # ------------------
-        p.add_argument("--smooth-frames", type=int, default=3)
+        p.add_argument("--smooth-frames", type=non_negative_int, default=3)
         p.add_argument("--stability-frames", type=int, default=4)
         p.add_argument("--hold-tolerance", type=float, default=0.5)
 
@@ -44,15 +75,46 @@ def build_arg_parser():
         # ------------------
         p.add_argument("--lane-range", type=int, default=9)
 
+        # ------------------
+        # Export
+        # ------------------
+        p.add_argument(
+            "--no-raw-pitches", dest="include_raw_pitches", action="store_false",
+            help="Leave the raw per-frame pitch data out of the exported chart",
+        )
+        p.add_argument(
+            "--pitch-decimation", type=positive_int, default=1,
+            help="Export only every Nth voiced raw pitch frame",
+        )
+
         return p
 
 
+def nearest_power_of_two(n: int) -> int:
+        lower = 1 << (n.bit_length() - 1)
+        upper = lower << 1
+        return lower if n - lower < upper - n else upper
+
+
+def power_of_two_size(name: str, n: int) -> int:
+        if n & (n - 1) == 0:
+            return n
+        rounded = nearest_power_of_two(n)
+        print(
+            f"warning: --{name} {n} is not a power of two, using {rounded}",
+            file=sys.stderr,
+        )
+        return rounded
+
+
 def build_cfg_from_args(args) -> dict:
         return {
-            "window_size": args.window_size,
-            "hop_size": args.hop_size,
+            "window_size": power_of_two_size("window-size", args.window_size),
+            "hop_size": power_of_two_size("hop-size", args.hop_size),
             "min_freq": args.min_freq,
             "max_freq": args.max_freq,
+            "analysis_sr": args.analysis_sr,
+            "min_confidence": args.min_confidence,
             "smooth_frames": args.smooth_frames,
             "stability_frames": args.stability_frames,
             "hold_tolerance": args.hold_tolerance,
@@ -64,6 +126,8 @@ def build_cfg_from_args(args) -> dict:
             "stretch_factor": args.stretch_factor,
             "final_merge_gap": args.final_merge_gap,
             "lane_range": args.lane_range,
+            "include_raw_pitches": args.include_raw_pitches,
+            "pitch_decimation": args.pitch_decimation,
         }
 
 
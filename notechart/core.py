@@ -1,183 +1,266 @@
 import json
 import math
+import os
 import re
+import threading
 import numpy as np
 import soundfile as sf
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from pathlib import Path
-from aubio import source, pitch
+from aubio import fvec, source, pitch
+
+from . import _pipeline
+
+try:
+    import orjson
+except ImportError:
+    # orjson is optional: export falls back to the stdlib encoder
+    orjson = None
 
 LRC_LINE = re.compile(r"\[(\d+):(\d+\.\d+)\](.*)")
 
-class NoteChartGenerator:
-    def __init__(
-        self,
-        audio_path: str | Path,
-        *,
-        cfg: dict,
-    ):
-        self.audio_path = Path(audio_path).expanduser().resolve()
-        if not self.audio_path.exists():
-            raise FileNotFoundError(f"Audio file not found: {self.audio_path}")
 
+# Idle YIN detectors, keyed by (samplerate, window size, hop size). A detector
+# keeps its sample window between calls, so it is taken out of the cache while
+# in use and concurrent analyses never feed hops into the same one.
+_PITCH_CACHE = {}
+_PITCH_CACHE_LOCK = threading.Lock()
+
+
+def _acquire_pitch_detector(sr, window_size, hop_size):
+    with _PITCH_CACHE_LOCK:
+        idle = _PITCH_CACHE.get((sr, window_size, hop_size))
+        detector = idle.pop() if idle else None
+    if detector is None:
+        detector = pitch("yinfast", window_size, hop_size, sr)
+        detector.set_unit("Hz")
+        detector.set_silence(-30)
+        detector.set_tolerance(0.8)
+    else:
+        # aubio has no reset, so push the previous file's samples out of the
+        # analysis window; a fresh detector starts from an all-zero window.
+        silence = fvec(hop_size)
+        for _ in range(-(-window_size // hop_size)):
+            detector(silence)
+    return detector
+
+
+def _release_pitch_detector(detector, sr, window_size, hop_size):
+    with _PITCH_CACHE_LOCK:
+        _PITCH_CACHE.setdefault((sr, window_size, hop_size), []).append(detector)
+
+
+# Plain-Python pipeline stages for installs without numba. Running the
+# kernels uncompiled would index ndarrays element by element from the
+# interpreter, which is far slower than looping over lists; NaN marks
+# unvoiced frames and is tested with `p != p`.
+def _python_clamp_octaves(pitches):
+    result = []
+    prev = 0.0
+    for p in pitches:
+        if p != 0 and prev != 0:
+            if p > prev * 1.9:
+                p *= 0.5
+            elif p < prev * 0.55:
+                p *= 2.0
+        result.append(p)
+        prev = p
+    return result
+
+
+def _python_hysteresis(pitches, stability_frames):
+    stable = []
+    current = math.nan
+    candidate = math.nan
+    count = 0
+    for p in pitches:
+        if p != p:
+            stable.append(math.nan)
+            candidate = math.nan
+            count = 0
+            continue
+        if p == candidate:
+            count += 1
+        else:
+            candidate = p
+            count = 1
+        if count >= stability_frames:
+            current = candidate
+        stable.append(current)
+    return stable
+
+
+def _python_hold(pitches, hold_tolerance):
+    held = []
+    last = math.nan
+    for p in pitches:
+        if p != p:
+            last = math.nan
+        elif last != last or abs(p - last) > hold_tolerance:
+            last = p
+        held.append(last)
+    return held
+
+
+def _python_fill_gaps(times, pitches, max_gap):
+    filled = []
+    last_pitch = math.nan
+    last_time = 0.0
+    for t, p in zip(times, pitches):
+        if p != p and last_pitch == last_pitch and t - last_time < max_gap:
+            filled.append(last_pitch)
+        else:
+            filled.append(p)
+            last_pitch = p
+            last_time = t
+    return filled
+
+
+class NoteChartAnalyzer:
+    __slots__ = ("cfg",)
+
+    def __init__(self, cfg: dict):
         self.cfg = cfg
-        self.notes = []
-        self.export_data = {}
-    
+
     # ------------------------------
     # UTILITY FUNCTIONS
     # ------------------------------
     @staticmethod
     def hz_to_midi(freq):
-        return 69 + 12 * math.log2(freq / 440) if freq and freq > 0 else None
+        if np.ndim(freq) == 0:
+            return 69 + 12 * math.log2(freq / 440) if freq and freq > 0 else None
+        # Arrays convert in one pass, with NaN for unvoiced entries
+        freq = np.asarray(freq, dtype=np.float64)
+        voiced = freq > 0
+        return np.where(voiced, 69 + 12 * np.log2(np.where(voiced, freq, 440.0) / 440.0), np.nan)
 
     @staticmethod
     def clamp_octaves(pitches):
-        result = []
-        prev = 0.0
-        for p in pitches:
-            if p == 0 or prev == 0:
-                result.append(p)
-            else:
-                if p > prev * 1.9:
-                    p *= 0.5
-                elif p < prev * 0.55:
-                    p *= 2.0
-                result.append(p)
-            prev = p
-        return result
+        pitches = np.ascontiguousarray(pitches, dtype=np.float64)
+        if _pipeline.HAVE_NUMBA:
+            return _pipeline.clamp_octaves(pitches)
+        return np.array(_python_clamp_octaves(pitches.tolist()))
 
     @staticmethod
     def smooth_time_series(pitches, window_size):
-        smoothed = []
-        for i in range(len(pitches)):
-            window = pitches[max(0, i - window_size): i + 1]
-            valid = [p for p in window if p > 0]
-            smoothed.append(sum(valid) / len(valid) if valid else 0.0)
-        return smoothed
+        # Trailing moving average over voiced (p > 0) frames only. Compiled,
+        # a single sliding-window pass wins; otherwise use cumulative sums of
+        # the masked values and of the mask itself.
+        pitches = np.ascontiguousarray(pitches, dtype=np.float64)
+        if _pipeline.HAVE_NUMBA:
+            return _pipeline.smooth_time_series(pitches, window_size)
+        valid = pitches > 0
+        csum = np.concatenate(([0.0], np.cumsum(np.where(valid, pitches, 0.0))))
+        ccount = np.concatenate(([0], np.cumsum(valid)))
+        idx = np.arange(len(pitches))
+        lo = np.maximum(idx - window_size, 0)
+        total = csum[idx + 1] - csum[lo]
+        count = ccount[idx + 1] - ccount[lo]
+        return np.divide(total, count, out=np.zeros_like(total), where=count > 0)
 
     @staticmethod
     def apply_hysteresis(pitches, stability_frames):
-        stable = []
-        current = None
-        candidate = None
-        count = 0
-        for p in pitches:
-            if p is None:
-                stable.append(None)
-                candidate = None
-                count = 0
-                continue
-            if p == candidate:
-                count += 1
-            else:
-                candidate = p
-                count = 1
-            if count >= stability_frames:
-                current = candidate
-            stable.append(current)
-        return stable
+        pitches = np.ascontiguousarray(pitches, dtype=np.float64)
+        if _pipeline.HAVE_NUMBA:
+            return _pipeline.apply_hysteresis(pitches, stability_frames)
+        return np.array(_python_hysteresis(pitches.tolist(), stability_frames))
 
     @staticmethod
     def hold_pitch(pitches, hold_tolerance):
-        held = []
-        last = None
-        for p in pitches:
-            if p is None:
-                held.append(None)
-                last = None
-            elif last is None or abs(p - last) > hold_tolerance:
-                held.append(p)
-                last = p
-            else:
-                held.append(last)
-        return held
+        pitches = np.ascontiguousarray(pitches, dtype=np.float64)
+        if _pipeline.HAVE_NUMBA:
+            return _pipeline.hold_pitch(pitches, hold_tolerance)
+        return np.array(_python_hold(pitches.tolist(), hold_tolerance))
 
     @staticmethod
     def fill_micro_gaps(times, pitches, max_gap=0.3):
-        filled = []
-        last_pitch = None
-        last_time = None
-        for t, p in zip(times, pitches):
-            if p is None and last_pitch is not None and t - last_time < max_gap:
-                filled.append(last_pitch)
-            else:
-                filled.append(p)
-                last_pitch = p
-                last_time = t
-        return filled
+        times = np.ascontiguousarray(times, dtype=np.float64)
+        pitches = np.ascontiguousarray(pitches, dtype=np.float64)
+        if _pipeline.HAVE_NUMBA:
+            return _pipeline.fill_micro_gaps(times, pitches, max_gap)
+        return np.array(_python_fill_gaps(times.tolist(), pitches.tolist(), max_gap))
+
+    @staticmethod
+    def stabilize(times, pitches, stability_frames, hold_tolerance, max_gap=0.3):
+        times = np.ascontiguousarray(times, dtype=np.float64)
+        pitches = np.ascontiguousarray(pitches, dtype=np.float64)
+        if _pipeline.HAVE_NUMBA:
+            return _pipeline.stabilize(
+                times, pitches, stability_frames, hold_tolerance, max_gap
+            )
+        values = _python_hysteresis(pitches.tolist(), stability_frames)
+        values = _python_hold(values, hold_tolerance)
+        return np.array(_python_fill_gaps(times.tolist(), values, max_gap))
+
+    @classmethod
+    def process_pitches(cls, times, pitches, smooth_frames, stability_frames,
+                        hold_tolerance, max_gap=0.3):
+        times = np.ascontiguousarray(times, dtype=np.float64)
+        pitches = np.ascontiguousarray(pitches, dtype=np.float64)
+        if _pipeline.HAVE_NUMBA:
+            return _pipeline.pitch_pipeline(
+                times, pitches, smooth_frames, stability_frames, hold_tolerance, max_gap
+            )
+
+        # Without numba, run the stages as separate vectorized passes
+        pitches = cls.clamp_octaves(pitches)
+        pitches = cls.smooth_time_series(pitches, smooth_frames)
+        # Unvoiced frames are carried through the pipeline as NaN
+        midi = cls.hz_to_midi(pitches)
+        quantized = np.rint(midi * 2.0) * 0.5
+        return cls.stabilize(times, quantized, stability_frames, hold_tolerance, max_gap)
 
     @staticmethod
     def segment_notes(times, pitches):
-        notes = []
-        current_pitch = None
-        start_time = None
-        for t, p in zip(times, pitches):
-            if p is None:
-                if current_pitch is not None:
-                    notes.append({"start": start_time, "end": t, "pitch": current_pitch})
-                    current_pitch = None
-                continue
-            if current_pitch is None:
-                current_pitch = p
-                start_time = t
-            elif p != current_pitch:
-                notes.append({"start": start_time, "end": t, "pitch": current_pitch})
-                current_pitch = p
-                start_time = t
-        if current_pitch is not None:
-            notes.append({"start": start_time, "end": times[-1], "pitch": current_pitch})
-        return notes
+        times = np.asarray(times, dtype=np.float64)
+        pitches = np.asarray(pitches, dtype=np.float64)
+        n = len(pitches)
+        if n == 0:
+            return np.empty(0), np.empty(0), np.empty(0)
+
+        # Run-length encode: a run starts wherever the value changes. NaN never
+        # equals itself, so every unvoiced frame starts its own run and is
+        # dropped below.
+        changes = np.empty(n, dtype=bool)
+        changes[0] = True
+        changes[1:] = pitches[1:] != pitches[:-1]
+        run_starts = np.flatnonzero(changes)
+        run_ends = np.append(run_starts[1:], n)
+
+        voiced = ~np.isnan(pitches[run_starts])
+        run_starts = run_starts[voiced]
+        run_ends = np.minimum(run_ends[voiced], n - 1)
+
+        return times[run_starts], times[run_ends], pitches[run_starts]
 
     @staticmethod
     def merge_notes(notes, gap, pitch_tol, min_duration=0.0):
-        merged = []
-        for n in notes:
-            if n["end"] - n["start"] < min_duration:
-                continue
-            if not merged:
-                merged.append(n.copy())
-                continue
-            prev = merged[-1]
-            close_pitch = abs(n["pitch"] - prev["pitch"]) <= pitch_tol
-            close_time = n["start"] - prev["end"] <= gap
-            if close_pitch and close_time:
-                prev["end"] = n["end"]
-                prev["pitch"] = (prev["pitch"] + n["pitch"]) / 2
-            else:
-                merged.append(n.copy())
-        return merged
+        starts, ends, pitches = notes
+        return _pipeline.merge_notes(starts, ends, pitches, gap, pitch_tol, min_duration)
 
     @staticmethod
     def mash_merge(notes, gap):
-        result = []
-        buffer = []
-        for n in notes:
-            if not buffer:
-                buffer.append(n.copy())
-                continue
-            if n["start"] - buffer[-1]["end"] <= gap:
-                buffer.append(n.copy())
-            else:
-                result.append({
-                    "start": buffer[0]["start"],
-                    "end": buffer[-1]["end"],
-                    "pitch": sum(b["pitch"] for b in buffer) / len(buffer)
-                })
-                buffer = [n.copy()]
-        if buffer:
-            result.append({
-                "start": buffer[0]["start"],
-                "end": buffer[-1]["end"],
-                "pitch": sum(b["pitch"] for b in buffer) / len(buffer)
-            })
-        return result
+        starts, ends, pitches = notes
+        if len(starts) == 0:
+            return starts, ends, pitches
+
+        # A group continues while each note starts within `gap` of the previous end
+        first = np.concatenate(([0], np.flatnonzero(starts[1:] - ends[:-1] > gap) + 1))
+        last = np.append(first[1:] - 1, len(starts) - 1)
+        group_pitches = np.add.reduceat(pitches, first) / (last - first + 1)
+        return starts[first], ends[last], group_pitches
     
     # ------------------------------
-    # GENERATE & EXPORT
+    # PROCESS
     # ------------------------------
-    def generate_chart(self):
-        if self.cfg is None:
-            self.load_config()
+    def process(self, audio_path: str | Path) -> dict:
+        chart, _ = self._analyze(audio_path)
+        return chart
+
+    def _analyze(self, audio_path):
+        audio_path = Path(audio_path).expanduser().resolve()
+        if not audio_path.exists():
+            raise FileNotFoundError(f"Audio file not found: {audio_path}")
 
         cfg = self.cfg
 
@@ -186,9 +269,15 @@ class NoteChartGenerator:
         HOP_SIZE = cfg["hop_size"]
         MIN_FREQ = cfg["min_freq"]
         MAX_FREQ = cfg["max_freq"]
+        ANALYSIS_SR = cfg.get("analysis_sr")
+        if ANALYSIS_SR is not None and ANALYSIS_SR <= 0:
+            raise ValueError(f"analysis_sr must be a positive sample rate, got {ANALYSIS_SR}")
+        MIN_CONFIDENCE = cfg.get("min_confidence", 0.0)
 
         # Pitch stability
         SMOOTH_FRAMES = cfg["smooth_frames"]
+        if SMOOTH_FRAMES < 0:
+            raise ValueError(f"smooth_frames must be at least 0, got {SMOOTH_FRAMES}")
         STABILITY_FRAMES = cfg["stability_frames"]
         HOLD_TOLERANCE = cfg["hold_tolerance"]
 
@@ -205,43 +294,75 @@ class NoteChartGenerator:
         # Final mash
         FINAL_MERGE_GAP = cfg["final_merge_gap"]
 
+        # Raw pitch export
+        INCLUDE_RAW_PITCHES = cfg.get("include_raw_pitches", True)
+        PITCH_DECIMATION = cfg.get("pitch_decimation", 1)
+        if PITCH_DECIMATION < 1:
+            raise ValueError(f"pitch_decimation must be at least 1, got {PITCH_DECIMATION}")
+
         # --------------------------
         # Load audio
         # --------------------------
-        audio, sr = sf.read(str(self.audio_path))
-        if audio.ndim > 1:
-            audio = audio.mean(axis=1)
-
-        src = source(str(self.audio_path), sr, HOP_SIZE)
-        pitch_detector = pitch("yin", WINDOW_SIZE, HOP_SIZE, sr)
-        pitch_detector.set_unit("Hz")
-        pitch_detector.set_silence(-30)
-        pitch_detector.set_tolerance(0.8)
-
-        times, pitches = [], []
+        # Only the stream metadata is needed here; aubio decodes the audio
+        info = sf.info(str(audio_path))
+
+        # Analysing below the native rate cuts YIN cost roughly in proportion;
+        # aubio resamples while it decodes.
+        sr = ANALYSIS_SR or info.samplerate
+        if ANALYSIS_SR and MAX_FREQ >= sr / 2:
+            raise ValueError(
+                f"max_freq ({MAX_FREQ} Hz) must be below the Nyquist frequency "
+                f"of analysis_sr ({sr} Hz)"
+            )
+
+        src = source(str(audio_path), sr, HOP_SIZE)
+        pitch_detector = _acquire_pitch_detector(sr, WINDOW_SIZE, HOP_SIZE)
+
+        # One frame per full hop plus the final short (possibly empty) read
+        n_frames = info.frames * sr // info.samplerate // HOP_SIZE + 1
+        pitches = np.empty(n_frames, dtype=np.float64)
+        # Confidences are only needed for gating, so skip them when it is off
+        use_confidence = MIN_CONFIDENCE > 0
+        if use_confidence:
+            confidences = np.empty(n_frames, dtype=np.float64)
         total_samples = 0
-
-        while True:
-            samples, read = src()
-            p = pitch_detector(samples)[0]
-            pitches.append(p if MIN_FREQ <= p <= MAX_FREQ else 0.0)
-            times.append(total_samples / sr)
-            total_samples += read
-            if read < HOP_SIZE:
-                break
+        i = 0
+
+        try:
+            while True:
+                samples, read = src()
+                if i == len(pitches):
+                    # Header frame counts can be approximate for compressed formats
+                    pitches = np.concatenate((pitches, np.empty_like(pitches)))
+                    if use_confidence:
+                        confidences = np.concatenate((confidences, np.empty_like(confidences)))
+                pitches[i] = pitch_detector(samples)[0]
+                if use_confidence:
+                    confidences[i] = pitch_detector.get_confidence()
+                total_samples += read
+                i += 1
+                if read < HOP_SIZE:
+                    break
+        finally:
+            _release_pitch_detector(pitch_detector, sr, WINDOW_SIZE, HOP_SIZE)
+
+        # Every read but the last is a full hop, so frame k starts at k * HOP_SIZE
+        pitches = pitches[:i]
+        times = np.arange(i) * HOP_SIZE / sr
+
+        # Out-of-band and low-confidence detections count as unvoiced
+        voiced = (pitches >= MIN_FREQ) & (pitches <= MAX_FREQ)
+        if use_confidence:
+            voiced &= confidences[:i] >= MIN_CONFIDENCE
+        pitches = np.where(voiced, pitches, 0.0)
 
         # --------------------------
         # Pitch processing pipeline
         # --------------------------
-        raw_pitches = pitches.copy()
-        pitches = self.clamp_octaves(pitches)
-        pitches = self.smooth_time_series(pitches, SMOOTH_FRAMES)
-        midi = [self.hz_to_midi(p) for p in pitches]
-        quantized = [round(m * 2) / 2 if m else None for m in midi]
-
-        stable = self.apply_hysteresis(quantized, STABILITY_FRAMES)
-        held = self.hold_pitch(stable, HOLD_TOLERANCE)
-        filled = self.fill_micro_gaps(times, held)
+        raw_pitches = pitches
+        filled = self.process_pitches(
+            times, pitches, SMOOTH_FRAMES, STABILITY_FRAMES, HOLD_TOLERANCE
+        )
 
         # --------------------------
         # Note -> phrase generation
@@ -251,55 +372,144 @@ class NoteChartGenerator:
         notes = self.merge_notes(notes, PHRASE_GAP, PHRASE_PITCH_TOLERANCE)
 
         # Stretch phrases
-        for n in notes:
-            duration = n["end"] - n["start"]
-            n["end"] = n["start"] + duration * STRETCH_FACTOR
+        starts, ends, note_pitches = notes
+        notes = starts, starts + (ends - starts) * STRETCH_FACTOR, note_pitches
 
-        notes = self.mash_merge(notes, FINAL_MERGE_GAP)
+        starts, ends, note_pitches = self.mash_merge(notes, FINAL_MERGE_GAP)
 
         # --------------------------
         # Lane normalization & export
         # --------------------------
-        reference_pitch = np.median([n["pitch"] for n in notes])
+        reference_pitch = np.median(note_pitches)
         mid_lane = self.cfg["lane_range"] // 2
 
-        export_notes = []
-
-        for n in notes:
-            semitone_offset = round(12 * math.log2(n["pitch"] / reference_pitch))
+        offsets = np.round(12 * np.log2(note_pitches / reference_pitch)).astype(np.int64)
 
-            # 0 offset is true center
-            lane = mid_lane + semitone_offset
+        # 0 offset is true center, clamped to the available lanes
+        lanes = np.clip(mid_lane + offsets, 0, self.cfg["lane_range"] - 1)
 
-            # clamp to available lanes
-            lane = max(0, min(self.cfg["lane_range"] - 1, lane))
+        export_notes = [
+            {"start": start, "duration": duration, "lane": lane, "offset": offset}
+            for start, duration, lane, offset in zip(
+                np.round(starts, 3).tolist(),
+                np.round(ends - starts, 3).tolist(),
+                lanes.tolist(),
+                offsets.tolist(),
+            )
+        ]
 
-            export_notes.append({
-                "start": round(n["start"], 3),
-                "duration": round(n["end"] - n["start"], 3),
-                "lane": int(lane),
-                "offset": int(semitone_offset)  # optional but useful
-            })
-
-        self.export_data = {
-            "name": str(self.audio_path.stem),
+        chart = {
+            "name": str(audio_path.stem),
             "length": total_samples / sr,
             "reference_pitch": float(reference_pitch),
             "mid_lane": mid_lane,
             "lanes": self.cfg["lane_range"],
             "notes": export_notes,
-            "pitches": [{"time": float(t), "pitch": float(p), "midi": float(self.hz_to_midi(p))}
-                        for t, p in zip(times, raw_pitches) if p > 0],
-            "lyrics": [] 
         }
 
-        self.notes = notes
+        if INCLUDE_RAW_PITCHES:
+            # Raw pitches are debug/visualisation data; keep every Nth voiced frame
+            voiced = raw_pitches > 0
+            voiced_times = times[voiced][::PITCH_DECIMATION]
+            voiced_pitches = raw_pitches[voiced][::PITCH_DECIMATION]
+            chart["pitches"] = {
+                "times": voiced_times.tolist(),
+                "values": voiced_pitches.tolist(),
+                "midi": self.hz_to_midi(voiced_pitches).tolist(),
+            }
+
+        chart["lyrics"] = []
+
+        notes = [
+            {"start": start, "end": end, "pitch": p}
+            for start, end, p in zip(starts.tolist(), ends.tolist(), note_pitches.tolist())
+        ]
+        return chart, notes
+
+
+class NoteChartGenerator(NoteChartAnalyzer):
+    __slots__ = ("audio_path", "notes", "export_data")
+
+    def __init__(
+        self,
+        audio_path: str | Path,
+        *,
+        cfg: dict,
+    ):
+        self.audio_path = Path(audio_path).expanduser().resolve()
+        if not self.audio_path.exists():
+            raise FileNotFoundError(f"Audio file not found: {self.audio_path}")
+
+        super().__init__(cfg)
+        self.notes = []
+        self.export_data = {}
+
+    @classmethod
+    def generate_batch(cls, audio_paths, *, cfg, max_workers=None, output_dir=None):
+        if output_dir is not None:
+            # Charts are named after the input stem, so e.g. ArtistA/01.wav and
+            # ArtistB/01.wav would overwrite each other in a shared directory
+            seen = {}
+            for path in audio_paths:
+                stem = Path(path).stem
+                if stem in seen:
+                    raise ValueError(
+                        f"{seen[stem]} and {path} would both be exported to "
+                        f"{stem}_chart.json in {output_dir}"
+                    )
+                seen[stem] = path
+            Path(output_dir).mkdir(parents=True, exist_ok=True)
+
+        # Each worker builds its own generator; aubio objects can't be pickled.
+        # A failing file maps to its exception so the rest of the batch is kept.
+        results = {}
+        with ProcessPoolExecutor(max_workers=max_workers or os.cpu_count()) as pool:
+            futures = {
+                pool.submit(_process_one, cls, path, cfg, output_dir): path
+                for path in audio_paths
+            }
+            for done, future in enumerate(as_completed(futures), 1):
+                path = futures[future]
+                try:
+                    results[path] = future.result()
+                except Exception as e:
+                    results[path] = e
+                    print(f"[{done}/{len(futures)}] {path} failed: {e}")
+                else:
+                    print(f"[{done}/{len(futures)}] {path}")
+        return results
+    
+    # ------------------------------
+    # GENERATE & EXPORT
+    # ------------------------------
+    def generate_chart(self):
+        if self.cfg is None:
+            self.load_config()
+
+        self.export_data, self.notes = self._analyze(self.audio_path)
         return self.export_data
 
     def export(self, output_file: str | None = None):
         if not self.export_data:
             raise ValueError("No chart generated yet. Call generate_chart() first.")
         output_file = output_file or (self.audio_path.parent / f"{self.audio_path.stem}_chart.json")
-        with open(output_file, "w") as f:
-            json.dump(self.export_data, f, indent=2)
-        print(f"Exported chart to {output_file}")
\ No newline at end of file
+        if orjson is not None:
+            with open(output_file, "wb") as f:
+                f.write(orjson.dumps(
+                    self.export_data,
+                    option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY,
+                ))
+        else:
+            with open(output_file, "w") as f:
+                json.dump(self.export_data, f, indent=2)
+        print(f"Exported chart to {output_file}")
+        return output_file
+
+
+def _process_one(cls, audio_path, cfg, output_dir=None):
+    gen = cls(audio_path, cfg=cfg)
+    gen.generate_chart()
+    output_file = None
+    if output_dir is not None:
+        output_file = Path(output_dir) / f"{gen.audio_path.stem}_chart.json"
+    return gen.export(output_file)
@@ -9,6 +9,9 @@ setup(
         "numpy>=1.24.0",
         "soundfile>=0.12.1",
     ],
+    extras_require={
+        "fast": ["numba>=0.57.0", "orjson>=3.9.0"],
+    },
     entry_points={
         "console_scripts": [
             "notechart=notechart.cli:main",